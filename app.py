@@ -1,14 +1,33 @@
 # app.py
 from __future__ import annotations
+import functools
+import glob
+import hashlib
 import io
+import logging
 import os
+import shutil
+import threading
+import time
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 from flask import Flask, render_template, request, jsonify, send_file, send_from_directory, abort
+from flask.json.provider import DefaultJSONProvider
 from PIL import Image
 import numpy as np
 
-from dicom_utils import DicomController, load_dicom_images
+try:
+    import orjson
+except ImportError:  # optional: fall back to Flask's stdlib-json provider
+    orjson = None
+
+try:
+    import numba
+except ImportError:  # optional: the NumPy path in _normalize_to_u8 is used instead
+    numba = None
+
+from dicom_utils import DicomController, read_header_summary
 from field_organization import get_field_manager
 from settings import get_settings_manager
 
@@ -16,6 +35,29 @@ BASE_DIR = Path(__file__).resolve().parent
 CACHE_DIR = BASE_DIR / "cache"
 CACHE_DIR.mkdir(exist_ok=True)
 
+# On-disk cache of rendered previews, keyed by source file name and mtime
+PREVIEW_DIR = CACHE_DIR / ".previews"
+PREVIEW_DIR.mkdir(exist_ok=True)
+PREVIEW_CACHE_MAX_BYTES = 256 * 1024 * 1024
+PREVIEW_MAX_AGE = 3600
+
+# Copy uploads in large chunks; Werkzeug's default is 16 KiB per syscall
+UPLOAD_COPY_BUFFER = 1 << 20
+
+# Preview encodings selectable via ?fmt=: name -> (PIL format, mimetype, save options)
+PREVIEW_FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 90, "method": 0}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 90, "progressive": False}),
+    "png": ("PNG", "image/png", {"optimize": False, "compress_level": 1}),
+}
+DEFAULT_PREVIEW_FORMAT = "webp"
+
+# Header summaries for /api/cache/list, keyed by file name
+CACHE_INDEX: Dict[str, Dict[str, Any]] = {}
+
+# UI translation payloads per language, cleared on language change
+_TRANSLATIONS_CACHE: Dict[str, Dict[str, str]] = {}
+
 # Create language directory
 LANG_DIR = BASE_DIR / "languages"
 LANG_DIR.mkdir(exist_ok=True)
@@ -24,7 +66,34 @@ LANG_DIR.mkdir(exist_ok=True)
 SETTINGS_DIR = BASE_DIR / "settings"
 SETTINGS_DIR.mkdir(exist_ok=True)
 
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson, keeping Flask's key ordering."""
+    
+    def _options(self) -> int:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        return option | orjson.OPT_SORT_KEYS if self.sort_keys else option
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+    
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        # Hand orjson's bytes to the response directly instead of via str
+        obj = self._prepare_response_obj(args, kwargs)
+        data = orjson.dumps(obj, default=self.default, option=self._options())
+        return self._app.response_class(data, mimetype=self.mimetype)
+
+
 app = Flask(__name__, static_folder="static", template_folder="templates")
+if orjson is not None:
+    app.json = FastJSONProvider(app)
+# Let an X-Sendfile capable front end stream cached previews itself
+app.config["USE_X_SENDFILE"] = os.environ.get("FMRI_VIEWER_X_SENDFILE") == "1"
+logger = logging.getLogger(__name__)
 
 # Initialize managers on startup
 field_manager = get_field_manager()
@@ -32,27 +101,61 @@ settings_manager = get_settings_manager()
 
 # ─── helpers ────────────────────────────────────────────────────────────────
 
-def frame_to_png_bytes(frame):
-    """Convert a 2‑D numpy array to normalized PNG bytes."""
-    # Ensure frame is numpy array
-    if not isinstance(frame, np.ndarray):
-        raise ValueError(f"Expected numpy array, got {type(frame)}")
+if numba is not None:
+    @numba.njit(parallel=True, cache=True, fastmath=True)
+    def _scale_to_u8_kernel(frame, arr_min, scale, out):
+        """Fused subtract, scale and cast into *out*, rows split across threads."""
+        for i in numba.prange(frame.shape[0]):
+            for j in range(frame.shape[1]):
+                # float32 throughout, matching the NumPy path
+                out[i, j] = np.uint8((np.float32(frame[i, j]) - arr_min) * scale)
+        return out
     
-    # Print debug info
-    print(f"Converting frame: shape={frame.shape}, dtype={frame.dtype}, min={frame.min()}, max={frame.max()}")
-    
-    # Convert to float and normalize
-    arr = frame.astype(float)
-    arr_min = arr.min()
-    arr_max = arr.max()
+    def _warm_up_scale_kernel():
+        """Compile (or load from the on-disk cache) the common MR pixel dtypes."""
+        for dtype in (np.uint16, np.int16):
+            _scale_to_u8_kernel(np.zeros((2, 2), dtype=dtype), np.float32(0.0),
+                                np.float32(1.0), np.empty((2, 2), dtype=np.uint8))
     
+    # At import, so the first preview request doesn't pay for the JIT compile
+    # (cache=True makes this a disk load after the first run). It must run on
+    # the main thread: a parallel pool first launched from another thread can
+    # hang interpreter exit with the TBB threading layer
+    _warm_up_scale_kernel()
+else:
+    _scale_to_u8_kernel = None
+
+
+def _normalize_to_u8(frame, out):
+    """Linearly rescale a 2‑D frame into the preallocated uint8 array *out*."""
+    arr_min = frame.min()
+    arr_max = frame.max()
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Normalizing frame: shape=%s, dtype=%s, min=%s, max=%s",
+                     frame.shape, frame.dtype, arr_min, arr_max)
+
     if arr_max > arr_min:
-        arr = (arr - arr_min) / (arr_max - arr_min) * 255
+        # Scale factor is computed once so the per-pixel work is a multiply
+        scale = np.float32(255.0 / (float(arr_max) - float(arr_min)))
+        if _scale_to_u8_kernel is not None and frame.ndim == 2:
+            # One pass, no float32 temporary
+            return _scale_to_u8_kernel(frame, np.float32(arr_min), scale, out)
+        tmp = np.subtract(frame, arr_min, dtype=np.float32)
+        np.multiply(tmp, scale, out=tmp)
+        np.copyto(out, tmp, casting="unsafe")
     else:
-        arr = np.zeros_like(arr)
+        out.fill(0)
+    return out
+
+
+def frame_to_image_buf(frame, fmt: str = DEFAULT_PREVIEW_FORMAT) -> io.BytesIO:
+    """Convert a 2‑D numpy array to a normalized preview image in a rewound buffer."""
+    # Ensure frame is numpy array
+    if not isinstance(frame, np.ndarray):
+        raise ValueError(f"Expected numpy array, got {type(frame)}")
     
-    # Convert to uint8
-    arr = arr.astype(np.uint8)
+    # Normalize in float32 on the native dtype (no float64 copy of the frame)
+    arr = _normalize_to_u8(frame, np.empty(frame.shape, dtype=np.uint8))
     
     # If grayscale, ensure 2D array
     if arr.ndim == 2:
@@ -60,10 +163,98 @@ def frame_to_png_bytes(frame):
     else:
         raise ValueError(f"Unexpected array dimensions: {arr.ndim}")
     
+    # Previews favour encode speed over fidelity and file size
+    pil_format, _, options = PREVIEW_FORMATS[fmt]
     buf = io.BytesIO()
-    img.save(buf, format="PNG")
+    img.save(buf, format=pil_format, **options)
     buf.seek(0)
-    return buf.read()
+    return buf
+
+
+@functools.lru_cache(maxsize=64)
+def _controller_for(path_str: str, mtime_ns: int) -> DicomController:
+    """
+    Shared controller for a cached file; *mtime_ns* keys out stale parses.
+    
+    Entries are used by concurrent requests and only ever load header state;
+    pixel decoding uses a request-local controller (see preview()).
+    """
+    return DicomController(path_str)
+
+
+def _index_entry(path: Path) -> Dict[str, Any]:
+    """Cached header summary for *path*, refreshed when the file changes."""
+    mtime_ns = path.stat().st_mtime_ns
+    entry = CACHE_INDEX.get(path.name)
+    if entry is None or entry["mtime_ns"] != mtime_ns:
+        try:
+            summary = read_header_summary(path)
+        except Exception:
+            summary = {}
+        entry = {"name": path.name, "mtime_ns": mtime_ns, **summary}
+        CACHE_INDEX[path.name] = entry
+    return entry
+
+
+def _preview_path(path: Path, fmt: str) -> Path:
+    """Location of the cached *fmt* preview for *path* at its current mtime."""
+    return PREVIEW_DIR / f"{path.name}.{path.stat().st_mtime_ns}.{fmt}"
+
+
+def _send_preview(key: Path, mimetype: str):
+    """Send a cached preview from disk with conditional-GET validators."""
+    # A real path (not a BytesIO) lets the server use wsgi.file_wrapper/sendfile
+    return send_file(str(key), mimetype=mimetype, conditional=True, etag=True,
+                     last_modified=key.stat().st_mtime, max_age=PREVIEW_MAX_AGE)
+
+
+def _drop_previews(filename: str, keep_mtime: Optional[str] = None):
+    """Remove cached previews of *filename*, except those for *keep_mtime*."""
+    prefix_len = len(filename) + 1
+    for p in PREVIEW_DIR.glob(f"{glob.escape(filename)}.*"):
+        mtime, _, fmt = p.name[prefix_len:].partition(".")
+        if mtime.isdigit() and fmt in PREVIEW_FORMATS and mtime != keep_mtime:
+            p.unlink(missing_ok=True)
+
+
+def _evict_previews():
+    """Evict least recently used previews once the cache exceeds its bound."""
+    entries = []
+    for p in PREVIEW_DIR.iterdir():
+        if p.suffix == ".tmp":
+            continue
+        try:
+            entries.append((p.stat(), p))
+        except FileNotFoundError:
+            continue
+
+    total = sum(st.st_size for st, _ in entries)
+    if total <= PREVIEW_CACHE_MAX_BYTES:
+        return
+
+    # atime is bumped explicitly on every cache hit (see preview())
+    for st, p in sorted(entries, key=lambda e: e[0].st_atime):
+        p.unlink(missing_ok=True)
+        total -= st.st_size
+        if total <= PREVIEW_CACHE_MAX_BYTES:
+            break
+
+
+def _has_dicm_magic(stream) -> bool:
+    """Check for the DICM marker after the 128-byte preamble, then rewind."""
+    try:
+        stream.seek(128)
+        return stream.read(4) == b"DICM"
+    finally:
+        stream.seek(0)
+
+
+UI_TRANSLATION_KEYS = [
+    "UI_APP_TITLE", "UI_IMPORT_FILE", "UI_IMPORT_FOLDER", "UI_SETTINGS",
+    "UI_ATTRIBUTE", "UI_VALUE", "UI_SETTINGS_TITLE", "UI_OPTION1", "UI_OPTION2",
+    "UI_LANGUAGE", "UI_CANCEL", "UI_SAVE", "UI_REMOVE", "UI_FILTER_SETTINGS",
+    "UI_OK", "UI_SELECT_ALL", "UI_DESELECT_ALL"
+]
 
 # ─── routes ─────────────────────────────────────────────────────────────────
 
@@ -74,35 +265,80 @@ def index():
 
 @app.route("/api/cache/list")
 def list_cache():
-    files = [p.name for p in CACHE_DIR.glob("*.dcm")]
-    print(f"Found {len(files)} DICOM files in cache: {files[:5]}...")  # Print first 5 to avoid too long
-    return jsonify(files)
+    paths = list(CACHE_DIR.glob("*.dcm"))
+    files = [p.name for p in paths]
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Found %d DICOM files in cache: %s...", len(files), files[:5])
+    
+    if not request.args.get("details"):
+        return jsonify(files)
+    
+    # ?details=1 returns header summaries too, saving a metadata round-trip per file
+    for name in CACHE_INDEX.keys() - set(files):
+        CACHE_INDEX.pop(name, None)  # a concurrent listing may have dropped it
+    return jsonify([_index_entry(p) for p in paths])
 
 
 @app.route("/api/cache/preview/<filename>")
 def preview(filename):
     path = CACHE_DIR / filename
-    print(f"Preview requested for: {filename}, exists: {path.exists()}")
+    logger.debug("Preview requested for: %s", filename)
     
     if not path.exists():
         abort(404)
     
+    # PNG stays available for debugging; the default favours encode speed
+    fmt = request.args.get("fmt", DEFAULT_PREVIEW_FORMAT).lower()
+    if fmt not in PREVIEW_FORMATS:
+        abort(400)
+    mimetype = PREVIEW_FORMATS[fmt][1]
+    
+    key = _preview_path(path, fmt)
     try:
-        frames = load_dicom_images(path)
-        print(f"Loaded DICOM images only: {len(frames)} frames")
-        
-        if not frames:
-            print("No frames found in DICOM file")
+        # Record the access for LRU eviction without touching mtime,
+        # which drives Last-Modified/ETag for conditional requests
+        os.utime(key, (time.time(), key.stat().st_mtime))
+        return _send_preview(key, mimetype)
+    except FileNotFoundError:
+        # Not rendered yet, or evicted/replaced by a concurrent request
+        pass
+    
+    try:
+        # Only frame 0 is shown, so avoid decoding the whole volume. The
+        # controller is our own: its pixel data is freed with this request
+        # instead of living on in the shared LRU (the preview is cached on disk)
+        frame = DicomController(path).get_first_image()
+        if frame is None:
+            logger.debug("No frames found in DICOM file %s", filename)
             abort(415)  # Unsupported Media
         
-        png_data = frame_to_png_bytes(frames[0])
-        print(f"Generated PNG: {len(png_data)} bytes")
+        image_buf = frame_to_image_buf(frame, fmt)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Generated %s: %d bytes", fmt.upper(), image_buf.getbuffer().nbytes)
+        
+        # Replace stale previews of this file, then publish atomically
+        try:
+            _drop_previews(filename, keep_mtime=str(path.stat().st_mtime_ns))
+            # pid and thread id keep concurrent renders of the same preview apart
+            tmp = key.with_name(f"{key.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(image_buf.getbuffer())
+            tmp.replace(key)
+            _evict_previews()
+        except OSError as e:
+            logger.warning("Could not cache preview %s: %s", key.name, e)
         
-        return send_file(io.BytesIO(png_data), mimetype="image/png")
+        # Serve the cached copy so every response carries the same validators
+        try:
+            return _send_preview(key, mimetype)
+        except FileNotFoundError:
+            # Caching failed, or a concurrent request already evicted it
+            pass
+        
+        response = send_file(image_buf, mimetype=mimetype, max_age=PREVIEW_MAX_AGE)
+        response.set_etag(hashlib.blake2b(image_buf.getbuffer(), digest_size=16).hexdigest())
+        return response.make_conditional(request)
     except Exception as e:
-        print(f"Error processing {filename}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error processing %s: %s", filename, e)
         abort(500)
 
 
@@ -113,7 +349,7 @@ def meta(filename):
         abort(404)
     
     # Use DicomController to get ordered metadata list
-    controller = DicomController(path)
+    controller = _controller_for(str(path), path.stat().st_mtime_ns)
     metadata = controller.get_metadata()
     
     # Metadata is already a list of {"name": ..., "value": ...} dicts
@@ -125,6 +361,9 @@ def delete(filename):
     f = CACHE_DIR / filename
     if f.exists():
         f.unlink()
+    _drop_previews(filename)
+    _controller_for.cache_clear()
+    CACHE_INDEX.pop(filename, None)
     return ("", 204)
 
 
@@ -133,10 +372,16 @@ def import_files():
     files = request.files.getlist("files[]")
     added = []
     for f in files:
-        if not f.filename.lower().endswith(".dcm"):
+        name = Path(f.filename).name
+        has_dcm_suffix = name.lower().endswith(".dcm")
+        # Accept extension-less series files by their DICM magic; .dcm files
+        # are still taken as-is since legacy ones may lack the preamble
+        if not (has_dcm_suffix or _has_dicm_magic(f.stream)):
             continue
-        dest = CACHE_DIR / Path(f.filename).name
-        f.save(dest)
+        # The cache listing only picks up *.dcm files
+        dest = CACHE_DIR / (name if has_dcm_suffix else f"{name}.dcm")
+        with open(dest, "wb", buffering=0) as out:
+            shutil.copyfileobj(f.stream, out, length=UPLOAD_COPY_BUFFER)
         added.append(dest.name)
     return jsonify(added)
 
@@ -144,7 +389,9 @@ def import_files():
 @app.route("/api/language/<lang>", methods=["POST"])
 def set_language(lang):
     """Set language."""
-    settings_manager.language = lang
+    # Goes through the field manager so its translations are reloaded too
+    field_manager.set_language(lang)
+    _TRANSLATIONS_CACHE.clear()
     return jsonify({"status": "ok", "language": lang})
 
 
@@ -160,37 +407,43 @@ def get_language():
 @app.route("/api/translations", methods=["GET"])
 def get_translations():
     """Get current language's UI translations."""
-    ui_keys = [
-        "UI_APP_TITLE", "UI_IMPORT_FILE", "UI_IMPORT_FOLDER", "UI_SETTINGS",
-        "UI_ATTRIBUTE", "UI_VALUE", "UI_SETTINGS_TITLE", "UI_OPTION1", "UI_OPTION2",
-        "UI_LANGUAGE", "UI_CANCEL", "UI_SAVE", "UI_REMOVE", "UI_FILTER_SETTINGS",
-        "UI_OK", "UI_SELECT_ALL", "UI_DESELECT_ALL"
-    ]
+    language = settings_manager.language
+    translations = _TRANSLATIONS_CACHE.get(language)
+    if translations is None:
+        translations = {key: field_manager.translations.get(key, key) for key in UI_TRANSLATION_KEYS}
+        _TRANSLATIONS_CACHE[language] = translations
     
-    # Get fresh translations from field manager
-    field_manager = get_field_manager()
-    translations = {key: field_manager.translations.get(key, key) for key in ui_keys}
-    return jsonify(translations)
+    # The URL does not change with the language, so let the browser keep the
+    # payload but revalidate it; unchanged translations come back as 304.
+    # The ETag hashes the body, so edited language files invalidate it too
+    response = jsonify(translations)
+    response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 @app.route("/api/filter/structure", methods=["GET"])
 def get_filter_structure():
     """Get category and field structure for filter settings."""
-    field_manager = get_field_manager()
+    # Cached and shared by the field manager, so overlay state on copies
     structure = field_manager.get_categories_with_fields()
     
+    # Look up every field's visibility in one batch
+    all_indices = [f["index"] for data in structure.values() for f in data["fields"]]
+    visibility = iter(settings_manager.are_fields_visible(all_indices))
+    
     # Add visibility state from settings
+    result = {}
     for category, data in structure.items():
         # Get category state
         field_indices = [f["index"] for f in data["fields"]]
         state = settings_manager.filter_settings.get_category_state(category, field_indices)
-        data["state"] = state
         
         # Get field states
-        for field in data["fields"]:
-            field["visible"] = settings_manager.is_field_visible(field["index"])
+        fields = [{**field, "visible": next(visibility)} for field in data["fields"]]
+        result[category] = {**data, "state": state, "fields": fields}
     
-    return jsonify(structure)
+    return jsonify(result)
 
 
 @app.route("/api/filter/settings", methods=["GET"])
@@ -218,4 +471,5 @@ def update_filter_settings():
 
 
 if __name__ == "__main__":
-    app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
+    # Development server only; use wsgi.py with a WSGI server in production
+    app.run(debug=bool(os.environ.get("FLASK_DEBUG")), host='127.0.0.1', port=5000)
\ No newline at end of file
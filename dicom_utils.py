@@ -1,50 +1,243 @@
 # dicom_utils.py
 """DICOM controller with unified field management system."""
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Callable, Dict, Iterable, List, Mapping, Tuple, Optional, Any
 import numpy as np
 import pydicom
 from pydicom.dataset import FileDataset
+from pydicom.tag import BaseTag, Tag
 
 # Import field management
 from field_organization import get_field_manager
 
-# Import specific interpreters
-from interpreters import specific_interpreters
+__all__ = [
+    "DicomController", "load_dicom_images", "load_dicom_metadata", "load_dicom_full", "load_dicom_directory",
+    "load_metadata_columns", "read_header_summary",
+]
 
-__all__ = ["DicomController", "load_dicom_images", "load_dicom_full"]
+# Modality and Scanning Sequence, checked before the rest of the slice timing context
+_MODALITY_TAG = Tag(0x0008, 0x0060)
+_SCANNING_SEQUENCE_TAG = Tag(0x0018, 0x0020)
+
+# Tags feeding the slice timing context, keyed by context name
+_SLICE_TIMING_CONTEXT_TAGS: Dict[str, BaseTag] = {
+    "manufacturer": Tag(0x0008, 0x0070),
+    "device_model": Tag(0x0008, 0x1090),
+    "image_type": Tag(0x0008, 0x0008),
+    "tr": Tag(0x0018, 0x0080),
+    "rows": Tag(0x0028, 0x0010),
+    "columns": Tag(0x0028, 0x0011),
+    # Timing tags
+    "slice_timing_siemens": Tag(0x0019, 0x1029),
+    "trigger_time": Tag(0x0018, 0x1060),
+    "rtia_timer": Tag(0x0021, 0x105E),
+    "protocol_data_block": Tag(0x0025, 0x101B),
+    "temporal_position_identifier": Tag(0x0020, 0x0100),
+    "frame_acquisition_time": Tag(0x0018, 0x9074),
+}
+# Private creators of the blocks holding the private timing tags above. Implicit VR
+# files carry no VR, so pydicom needs these to look the private elements up
+_PRIVATE_CREATOR_TAGS = (Tag(0x0019, 0x0010), Tag(0x0021, 0x0010), Tag(0x0025, 0x0010))
+# Large private blobs the interpreter only tests for presence; only a presence
+# flag is stored, so their (deferred) bytes are never read
+_PRESENCE_ONLY_CONTEXT_TAGS = frozenset({"protocol_data_block"})
+
+# Header tags summarised for the cache listing
+_SUMMARY_TAGS = {
+    "sop_instance_uid": (0x0008, 0x0018),
+    "modality": (0x0008, 0x0060),
+    "rows": (0x0028, 0x0010),
+    "columns": (0x0028, 0x0011),
+}
+
+
+def _element_value(ds: FileDataset, tag: BaseTag) -> Any:
+    elem = ds.get(tag)
+    return elem.value if elem is not None else None
+
+
+def _make_getter(tag_spec: Any) -> Callable[["DicomController", FileDataset], Any]:
+    """Specialize a field's tag specification into a (controller, dataset) getter."""
+    if isinstance(tag_spec, tuple) and len(tag_spec) == 2:
+        # Standard DICOM tag
+        tag = Tag(tag_spec)
+        return lambda controller, ds: _element_value(ds, tag)
+    
+    if isinstance(tag_spec, str):
+        # Direct attribute or special value
+        if tag_spec == "file_name":
+            return lambda controller, ds: controller.path.name
+        if tag_spec == "slice_timing_context":
+            # Build context for slice timing interpreter
+            return lambda controller, ds: controller._build_slice_timing_context()
+        return lambda controller, ds: getattr(ds, tag_spec, None)
+    
+    if isinstance(tag_spec, list):
+        # Special handling for complex tags
+        if tag_spec == ["file_meta", "TransferSyntaxUID"]:
+            return lambda controller, ds: (
+                str(ds.file_meta.TransferSyntaxUID) if hasattr(ds, 'file_meta') else None
+            )
+        if tag_spec == ["Rows", "Columns"]:
+            def get_dimensions(controller, ds):
+                rows = getattr(ds, 'Rows', None)
+                columns = getattr(ds, 'Columns', None)
+                return (rows, columns) if rows and columns else None
+            return get_dimensions
+    
+    return lambda controller, ds: None
+
+
+def _display_value(raw_value: Any, field_manager) -> str:
+    """Display string for an interpreted field value, translation tokens resolved."""
+    # Convert None to display string
+    if raw_value is None:
+        return "–"
+    
+    # Translate value components; most values (numbers, names) have none and
+    # only get translate_value's whitespace normalization
+    value = raw_value if type(raw_value) is str else str(raw_value)
+    if "VALUE_" in value or "MSG_" in value:
+        return field_manager.translate_value(value)
+    return ' '.join(value.split())
+
+
+def _display_column(values: List[Any], field_manager) -> List[str]:
+    """_display_value over one field's values for a whole series."""
+    # Files of a series mostly repeat the same values (manufacturer, TR, ...),
+    # so each distinct value is translated once
+    displayed: Dict[str, str] = {}
+    column = []
+    append = column.append
+    for raw_value in values:
+        value = "–" if raw_value is None else raw_value if type(raw_value) is str else str(raw_value)
+        text = displayed.get(value)
+        if text is None:
+            text = displayed[value] = _display_value(value, field_manager)
+        append(text)
+    return column
 
 
 class DicomController:
     """DICOM file controller with unified metadata handling."""
     
+    # Tags read outside the field definitions: slice timing context and frame count
+    _EXTRA_META_TAGS = [
+        _MODALITY_TAG, _SCANNING_SEQUENCE_TAG, *_SLICE_TIMING_CONTEXT_TAGS.values(),
+        *_PRIVATE_CREATOR_TAGS, Tag(0x0028, 0x0008),
+    ]
+    _META_TAGS: Optional[List[Any]] = None
+    # (tag column, per-field getters) specialized once for that column
+    _GETTERS: Tuple[Optional[List[Any]], List[Callable[["DicomController", FileDataset], Any]]] = (None, [])
+    
     def __init__(self, path: str | Path):
         self.path = Path(path)
-        self._ds: Optional[FileDataset] = None
-        self._images: Optional[List[np.ndarray]] = None
-        self._metadata: Optional[List[Dict[str, Any]]] = None
+        self._ds_meta_cache: Optional[FileDataset] = None
+        self._ds_full_cache: Optional[FileDataset] = None
+        self._images: Optional[np.ndarray] = None
+        # (field manager revision, metadata built against it), replaced as a unit
+        self._metadata: Optional[Tuple[int, List[Dict[str, Any]]]] = None
+        self._timing_context: Optional[Dict[str, Any]] = None
+    
+    @classmethod
+    def _meta_tags(cls) -> List[Any]:
+        """Tags needed to build metadata: the field tags plus our own extras."""
+        if cls._META_TAGS is None:
+            cls._META_TAGS = get_field_manager().required_tags + cls._EXTRA_META_TAGS
+        return cls._META_TAGS
+    
+    @property
+    def _ds_meta(self) -> FileDataset:
+        """Lazy load header-only dataset (no pixel data) for metadata."""
+        # Each cache attribute is read once into a local, so another thread
+        # replacing it between the check and the return can't yield None
+        ds = self._ds_full_cache
+        if ds is not None:
+            # A full read already holds every header element
+            return ds
+        ds = self._ds_meta_cache
+        if ds is None:
+            # Skip pixel data and every tag we never display. Large private blobs
+            # are deferred; pydicom reopens the path only if one is touched
+            ds = pydicom.dcmread(
+                str(self.path), stop_before_pixels=True, defer_size="1 KB",
+                specific_tags=self._meta_tags()
+            )
+            self._ds_meta_cache = ds
+        return ds
+    
+    @property
+    def _ds_full(self) -> FileDataset:
+        """Lazy load complete DICOM dataset, pixel data included."""
+        ds = self._ds_full_cache
+        if ds is None:
+            ds = pydicom.dcmread(str(self.path))
+            self._ds_full_cache = ds
+            self._ds_meta_cache = None
+        return ds
     
     @property
     def dataset(self) -> FileDataset:
-        """Lazy load DICOM dataset."""
-        if self._ds is None:
-            self._ds = pydicom.dcmread(str(self.path))
-        return self._ds
-    
-    def _extract_images(self) -> List[np.ndarray]:
-        """Extract image frames."""
-        if self._images is None:
+        """Lazy load complete DICOM dataset."""
+        return self._ds_full
+    
+    def _extract_images(self) -> np.ndarray:
+        """Extract image frames as one (frames, rows, columns) array."""
+        images = self._images
+        if images is None:
+            try:
+                pixel = self._ds_full.pixel_array
+                # Single frames get a leading axis; frames stay views of pixel
+                images = pixel[np.newaxis] if pixel.ndim == 2 else pixel
+            except Exception:
+                images = np.empty((0, 0, 0))
+            self._images = images
+        return images
+    
+    def _decode_first_frame(self) -> Optional[np.ndarray]:
+        """Decode frame 0 without decompressing the rest of the volume."""
+        try:
+            # pydicom >= 3 can decode a single frame straight from the file
+            from pydicom.pixels import pixel_array
+        except ImportError:
+            pixel_array = None
+        
+        if pixel_array is not None:
+            return pixel_array(str(self.path), index=0)
+        
+        # Older pydicom: slice the first frame out of native (uncompressed) data
+        ds = self._ds_full
+        if ds.file_meta.TransferSyntaxUID.is_compressed or ds.BitsAllocated % 8:
+            return None
+        from pydicom.pixel_data_handlers.util import pixel_dtype
+        
+        rows, columns = ds.Rows, ds.Columns
+        samples = getattr(ds, 'SamplesPerPixel', 1)
+        dtype = pixel_dtype(ds)
+        count = rows * columns * samples
+        frame = np.frombuffer(ds.PixelData, dtype=dtype, count=count)
+        return frame.reshape((rows, columns, samples) if samples > 1 else (rows, columns))
+    
+    def get_first_image(self) -> Optional[np.ndarray]:
+        """Get only the first frame, decoding as little pixel data as possible."""
+        images = self._images
+        if images is not None:
+            return images[0] if len(images) else None
+        
+        # Single-frame files gain nothing from the partial decode
+        if int(getattr(self._ds_meta, 'NumberOfFrames', 1) or 1) > 1:
             try:
-                pixel = self.dataset.pixel_array
-                if pixel.ndim == 2:
-                    self._images = [pixel]
-                elif pixel.ndim == 3:
-                    self._images = [pixel[i] for i in range(pixel.shape[0])]
-                else:
-                    self._images = [pixel]
+                frame = self._decode_first_frame()
+                if frame is not None:
+                    return frame
             except Exception:
-                self._images = []
-        return self._images
+                pass
+        
+        images = self._extract_images()
+        return images[0] if len(images) else None
+
     
     def _safe_get(self, tag_spec: Any) -> Any:
         """
@@ -56,147 +249,221 @@ class DicomController:
                 - String: Direct attribute name
                 - List: Special handling for complex tags
         """
-        ds = self.dataset
-        
-        if isinstance(tag_spec, tuple) and len(tag_spec) == 2:
-            # Standard DICOM tag
-            elem = ds.get(tag_spec)
-            return elem.value if elem is not None else None
-            
-        elif isinstance(tag_spec, str):
-            # Direct attribute or special value
-            if tag_spec == "file_name":
-                return self.path.name
-            elif tag_spec == "slice_timing_context":
-                # Build context for slice timing interpreter
-                return self._build_slice_timing_context()
-            else:
-                # Try to get as attribute
-                return getattr(ds, tag_spec, None)
-                
-        elif isinstance(tag_spec, list):
-            # Special handling for complex tags
-            if tag_spec == ["file_meta", "TransferSyntaxUID"]:
-                return str(ds.file_meta.TransferSyntaxUID) if hasattr(ds, 'file_meta') else None
-            elif tag_spec == ["Rows", "Columns"]:
-                rows = getattr(ds, 'Rows', None)
-                columns = getattr(ds, 'Columns', None)
-                return (rows, columns) if rows and columns else None
-                
-        return None
+        return _make_getter(tag_spec)(self, self._ds_meta)
+    
+    @classmethod
+    def _getters_for(cls, tags: List[Any]) -> List[Callable[["DicomController", FileDataset], Any]]:
+        """Getters aligned with the field manager's tag column, rebuilt when it is."""
+        source, getters = cls._GETTERS
+        if source is not tags:
+            getters = [_make_getter(tag_spec) for tag_spec in tags]
+            cls._GETTERS = (tags, getters)
+        return getters
     
     def _build_slice_timing_context(self) -> Dict[str, Any]:
-        """Build context for slice timing interpretation."""
-        ds = self.dataset
+        """Build context for slice timing interpretation (computed once per file)."""
+        if self._timing_context is not None:
+            return self._timing_context
         
-        def safe_get_tag(tag_tuple):
-            elem = ds.get(tag_tuple)
+        ds = self._ds_meta
+        
+        def safe_get_tag(tag):
+            elem = ds.get(tag)
             return elem.value if elem is not None else None
         
+        # Cheapest test first: slice timing only exists for MR acquisitions
+        modality = safe_get_tag(_MODALITY_TAG)
+        if modality is not None and modality != "MR":
+            self._timing_context = {}
+            return self._timing_context
+        
         # Check if this is an EPI sequence
-        scanning_seq = str(safe_get_tag((0x0018, 0x0020)) or "").upper()
+        scanning_seq = str(safe_get_tag(_SCANNING_SEQUENCE_TAG) or "").upper()
         if "EP" not in scanning_seq:
-            return {}
+            self._timing_context = {}
+            return self._timing_context
         
-        return {
-            "manufacturer": safe_get_tag((0x0008, 0x0070)),
-            "device_model": safe_get_tag((0x0008, 0x1090)),
-            "scanning_sequence": scanning_seq,
-            "image_type": safe_get_tag((0x0008, 0x0008)),
-            "tr": safe_get_tag((0x0018, 0x0080)),
-            "rows": getattr(ds, 'Rows', None),
-            "columns": getattr(ds, 'Columns', None),
-            # Timing tags
-            "slice_timing_siemens": safe_get_tag((0x0019, 0x1029)),
-            "trigger_time": safe_get_tag((0x0018, 0x1060)),
-            "rtia_timer": safe_get_tag((0x0021, 0x105E)),
-            "protocol_data_block": safe_get_tag((0x0025, 0x101B)),
-            "temporal_position_identifier": safe_get_tag((0x0020, 0x0100)),
-            "frame_acquisition_time": safe_get_tag((0x0018, 0x9074)),
-        }
+        # One pass over prebuilt Tag keys, no per-call tuple conversion
+        context = {}
+        for name, tag in _SLICE_TIMING_CONTEXT_TAGS.items():
+            if name in _PRESENCE_ONLY_CONTEXT_TAGS:
+                # Membership checks the element dict without loading the value
+                context[name] = True if tag in ds else None
+            else:
+                context[name] = safe_get_tag(tag)
+        context["scanning_sequence"] = scanning_seq
+        self._timing_context = context
+        return context
     
     def _extract_metadata(self) -> List[Dict[str, Any]]:
         """Extract and interpret metadata based on filtered field structure."""
-        if self._metadata is None:
-            field_manager = get_field_manager()
-            # Get filtered field structure
-            field_structure = field_manager.get_field_structure()
-            
+        field_manager = get_field_manager()
+        # Revision before columns (reading it picks up language/filter changes): the
+        # field manager bumps it only after publishing new columns, so metadata is
+        # never cached under a newer revision than the columns it was built from
+        revision = field_manager.revision
+        indices, tags, modes, interpreters, names = field_manager.get_filtered_columns()
+        
+        cached = self._metadata
+        if cached is None or cached[0] != revision:
             metadata = []
+            ds = self._ds_meta
+            getters = self._getters_for(tags)
+            timing_key_names = field_manager.timing_key_names
+            # Hot-loop names bound to locals (LOAD_FAST instead of global/attribute lookups)
+            append = metadata.append
+            translate_value = field_manager.translate_value
             
-            for field_info in field_structure:
+            for index, getter, mode, interpreter_func, name in zip(indices, getters, modes, interpreters, names):
                 # Get raw value
-                raw_value = self._safe_get(field_info["tag"])
+                raw_value = getter(self, ds)
                 
                 # Interpret value if needed
-                if field_info["interpret_mode"] == "Specific":
-                    # Get interpreter function by index name
-                    interpreter_func = getattr(specific_interpreters, field_info["index"], None)
+                if mode == "Specific":
+                    # Interpreter resolved by the field manager at load time
                     if interpreter_func:
                         interpreted_value = interpreter_func(raw_value)
                         
                         # Handle slice timing special case (returns dict)
-                        if field_info["index"] == "META_SLICE_TIMING" and isinstance(interpreted_value, dict):
+                        if index == "META_SLICE_TIMING" and isinstance(interpreted_value, Mapping):
                             # Add each timing field to metadata
                             for key, value in interpreted_value.items():
                                 timing_field = {
-                                    "name": field_manager.translations.get(key, key),
-                                    "value": field_manager.translate_value(value)
+                                    "name": timing_key_names.get(key, key),
+                                    "value": translate_value(value)
                                 }
-                                metadata.append(timing_field)
+                                append(timing_field)
                             continue
                         else:
                             raw_value = interpreted_value
                 
-                # Convert None to display string
-                if raw_value is None:
-                    raw_value = "–"
-                
-                # Translate value components
-                final_value = field_manager.translate_value(str(raw_value))
-                
                 # Add to metadata
-                metadata.append({
-                    "name": field_info["name"],
-                    "value": final_value
+                append({
+                    "name": name,
+                    "value": _display_value(raw_value, field_manager)
                 })
             
-            self._metadata = metadata
+            cached = (revision, metadata)
+            self._metadata = cached
         
-        return self._metadata
+        return cached[1]
     
-    def get_images(self) -> List[np.ndarray]:
-        """Get only images (no metadata)."""
+    def get_images(self) -> np.ndarray:
+        """Get only images (no metadata) as one (frames, rows, columns) array."""
         return self._extract_images()
     
+    def get_frames(self) -> List[np.ndarray]:
+        """Get images as a list of 2D frames, each a view into the same buffer."""
+        return list(self._extract_images())
+    
     def get_metadata(self) -> List[Dict[str, str]]:
         """Get only metadata as ordered list."""
-        # Clear cache to ensure fresh data
-        self._metadata = None
         return self._extract_metadata()
     
-    def get_full_data(self) -> Tuple[List[Dict[str, str]], List[np.ndarray]]:
+    def get_full_data(self) -> Tuple[List[Dict[str, str]], np.ndarray]:
         """Get both metadata and images."""
-        # Clear cache to ensure fresh data with current language/filters
-        self._metadata = None
-        
         metadata = self._extract_metadata()
         images = self._extract_images()
         return metadata, images
 
 
+def read_header_summary(path: str | Path) -> Dict[str, Any]:
+    """Read a few identifying header tags without touching pixel data."""
+    ds = pydicom.dcmread(
+        str(path), stop_before_pixels=True, specific_tags=list(_SUMMARY_TAGS.values())
+    )
+    summary = {}
+    for name, tag in _SUMMARY_TAGS.items():
+        elem = ds.get(tag)
+        value = elem.value if elem is not None else None
+        summary[name] = value if value is None or isinstance(value, int) else str(value)
+    return summary
+
+
 # Convenience functions for backward compatibility
-def load_dicom_images(path: str | Path) -> List[np.ndarray]:
+def load_dicom_images(path: str | Path) -> np.ndarray:
     """Load only DICOM images."""
     controller = DicomController(path)
     return controller.get_images()
 
 
-def load_dicom_full(path: str | Path) -> Tuple[List[Dict[str, str]], List[np.ndarray]]:
+def load_dicom_metadata(path: str | Path) -> List[Dict[str, str]]:
+    """Load only DICOM metadata (header read, no pixel data)."""
+    controller = DicomController(path)
+    return controller.get_metadata()
+
+
+def load_dicom_full(path: str | Path) -> Tuple[List[Dict[str, str]], np.ndarray]:
     """Load full DICOM data (metadata + images)."""
     controller = DicomController(path)
     return controller.get_full_data()
 
 
+def load_metadata_columns(paths: Iterable[str | Path]) -> Dict[str, List[str]]:
+    """
+    Interpret the metadata of a whole series column by column.
+    
+    Fields form the outer loop, so each field's getter, interpreter and slice
+    timing check are resolved once for all files instead of once per file.
+    Returns field index (or slice timing key) -> one display value per file,
+    in field order; slice timing rows a file does not produce hold "–".
+    """
+    controllers = [DicomController(path) for path in paths]
+    datasets = [controller._ds_meta for controller in controllers]
+    n_files = len(controllers)
+    
+    field_manager = get_field_manager()
+    indices, tags, modes, interpreters, names = field_manager.get_filtered_columns()
+    getters = DicomController._getters_for(tags)
+    
+    columns: Dict[str, List[str]] = {}
+    for index, getter, mode, interpreter_func in zip(indices, getters, modes, interpreters):
+        values = [getter(controller, ds) for controller, ds in zip(controllers, datasets)]
+        if mode == "Specific" and interpreter_func:
+            values = [interpreter_func(value) for value in values]
+        
+        if index != "META_SLICE_TIMING":
+            columns[index] = _display_column(values, field_manager)
+            continue
+        
+        # Slice timing expands into its own rows per file, as in _extract_metadata
+        for i, value in enumerate(values):
+            if not isinstance(value, Mapping):
+                columns.setdefault(index, ["–"] * n_files)[i] = _display_value(value, field_manager)
+                continue
+            for key, timing_value in value.items():
+                columns.setdefault(key, ["–"] * n_files)[i] = field_manager.translate_value(timing_value)
+    
+    return columns
+
+
+def _warmup_field_manager():
+    """Worker initializer: parse field definitions once per process, not per file."""
+    get_field_manager()
+    DicomController._meta_tags()
+
+
+def load_dicom_directory(
+    paths: Iterable[str | Path], workers: Optional[int] = None
+) -> List[List[Dict[str, str]]]:
+    """
+    Read and interpret the metadata of many DICOM files in worker processes.
+    
+    Files are independent and parsing is CPU-bound, so each worker builds its
+    own field manager and handles a chunk of paths. Only the metadata comes
+    back: pickling pixel volumes to the parent would cost more than parallel
+    decoding saves, so images are left to load_dicom_images on demand.
+    Results keep input order.
+    """
+    paths = list(paths)
+    if not paths:
+        return []
+    if (workers or os.cpu_count() or 1) <= 1:
+        # A single worker only adds process startup and IPC on top of the work
+        return [load_dicom_metadata(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warmup_field_manager) as executor:
+        return list(executor.map(load_dicom_metadata, paths, chunksize=16))
+
+
 # Backward compatibility alias
 load_dicom = load_dicom_full
\ No newline at end of file
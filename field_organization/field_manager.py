@@ -1,14 +1,24 @@
 # field_organization/field_manager.py
 """Unified field management system for DICOM metadata."""
+import functools
 import json
+import logging
+import re
+import sys
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from collections import defaultdict
 
 # Import settings management
 from settings import get_settings_manager
 
+# Import specific interpreters
+from interpreters import specific_interpreters
+from interpreters.slice_timing_interpreter import TIMING_RESULT_KEYS
+
+logger = logging.getLogger(__name__)
+
 
 # Category display order
 CATEGORY_ORDER = [
@@ -22,9 +32,43 @@ CATEGORY_ORDER = [
     "IMAGE_ENCODING",
     "SLICE_TIMING"
 ]
+# Sort rank per category; unknown categories sort last
+_CATEGORY_RANK = {name: i for i, name in enumerate(CATEGORY_ORDER)}
+_MISSING_CATEGORY_RANK = len(CATEGORY_ORDER)
+
+
+# Whitespace-delimited VALUE_*/MSG_* tokens inside interpreted values
+_TOKEN_RE = re.compile(r'(?<!\S)(?:VALUE_|MSG_)\S*')
+
+_FIELD_METADATA_PATH = Path(__file__).parent / "field_metadata.json"
+_LANGUAGES_DIR = Path(__file__).parent.parent / "languages"
+
 
+@functools.lru_cache(maxsize=None)
+def _load_field_json() -> Dict[str, Any]:
+    """Parse field_metadata.json once per process (shared, do not mutate)."""
+    with open(_FIELD_METADATA_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
-@dataclass
+
+@functools.lru_cache(maxsize=16)
+def _load_lang_json(language: str) -> Dict[str, str]:
+    """Parse a language file once per process (shared, do not mutate)."""
+    lang_file = _LANGUAGES_DIR / f"{language}.json"
+    try:
+        with open(lang_file, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+    except FileNotFoundError:
+        logger.warning("Language file not found: %s", lang_file)
+        return {}
+    # Interned once here, so every metadata row reuses the same name strings
+    return {
+        sys.intern(key): sys.intern(value) if isinstance(value, str) else value
+        for key, value in raw.items()
+    }
+
+
+@dataclass(slots=True)
 class FieldDefinition:
     """Definition of a DICOM field."""
     index: str
@@ -33,6 +77,7 @@ class FieldDefinition:
     priority: int
     interpret_mode: str
     translated_name: str = ""  # Will be filled by translator
+    interpreter: Optional[Callable[[Any], Any]] = None  # Resolved for "Specific" fields
 
 
 class FieldManager:
@@ -44,13 +89,35 @@ class FieldManager:
         # Filtered field definitions (for actual use)
         self._filtered_field_definitions: List[FieldDefinition] = []
         
+        self.current_language: Optional[str] = None
         self.translations: Dict[str, str] = {}
+        # Display names for slice timing result keys, rebuilt with translations
+        self.timing_key_names: Dict[str, str] = {}
+        # DICOM tags/keywords the field definitions read (for dcmread specific_tags)
+        self.required_tags: List[Any] = []
         self._category_fields: Dict[str, List[str]] = defaultdict(list)
+        # Complete definitions keyed by field index
+        self._by_index: Dict[str, FieldDefinition] = {}
         self._filter_initialized = False
         
+        # Bumped whenever translations or filtered definitions change
+        self._structure_version = 0
+        self._categories_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._categories_cache_version = -1
+        
+        # Filtered fields as parallel (indices, tags, modes, interpreters, names)
+        self._filtered_columns: Tuple[List[Any], ...] = ([], [], [], [], [])
+        # Filtered structure as dicts, rebuilt only when dirty
+        self._structure_cache: Optional[List[Dict[str, Any]]] = None
+        self._structure_dirty = True
+        # Settings filter version the filtered definitions were built from
+        self._seen_filter_version = -1
+        
         # Load initial data
         self._load_field_definitions()
         self._update_language()  # Get language from settings
+        # Later language changes are pushed to us instead of polled per call
+        get_settings_manager().add_language_listener(self.notify_language_change)
         self._sort_fields()
         self._build_category_map()
         
@@ -67,11 +134,10 @@ class FieldManager:
     
     def _load_field_definitions(self):
         """Load field definitions from JSON."""
-        json_path = Path(__file__).parent / "field_metadata.json"
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _load_field_json()
         
         self._complete_field_definitions.clear()
+        self.required_tags = []
         
         for field_data in data["fields"]:
             # Convert tag representation
@@ -87,23 +153,37 @@ class FieldManager:
                 priority=field_data["priority"],
                 interpret_mode=field_data["interpret_mode"]
             )
+            # Resolve the interpreter once instead of per field per file
+            if field_def.interpret_mode == "Specific":
+                field_def.interpreter = specific_interpreters.INTERPRETERS.get(field_def.index)
             self._complete_field_definitions.append(field_def)
+            self.required_tags.extend(self._tags_for_spec(tag))
+    
+    @staticmethod
+    def _tags_for_spec(tag: Any) -> List[Any]:
+        """DICOM tags or keywords read from the dataset for a field's tag spec."""
+        if isinstance(tag, tuple):
+            return [tag]
+        if isinstance(tag, list):
+            # file_meta is always read; other lists name dataset attributes
+            return [] if tag[0] == "file_meta" else list(tag)
+        if tag in ("file_name", "slice_timing_context"):
+            # Not dataset elements (the slice timing tags belong to DicomController)
+            return []
+        return [tag]
     
     def _update_language(self):
         """Update language from settings manager."""
         settings_manager = get_settings_manager()
+        if settings_manager.language == self.current_language:
+            return
         self.current_language = settings_manager.language
         self._load_translations()
     
     def _load_translations(self):
         """Load translations for current language."""
-        lang_file = Path(__file__).parent.parent / "languages" / f"{self.current_language}.json"
-        try:
-            with open(lang_file, 'r', encoding='utf-8') as f:
-                self.translations = json.load(f)
-        except FileNotFoundError:
-            print(f"Language file not found: {lang_file}")
-            self.translations = {}
+        self.translations = _load_lang_json(self.current_language)
+        self.timing_key_names = {key: self.translations.get(key, key) for key in TIMING_RESULT_KEYS}
         
         # Apply translations to complete field definitions
         for field_def in self._complete_field_definitions:
@@ -115,26 +195,25 @@ class FieldManager:
     def _sort_fields(self):
         """Sort complete field definitions by category, priority, and index."""
         def sort_key(field_def: FieldDefinition) -> Tuple[int, int, str]:
-            try:
-                category_index = CATEGORY_ORDER.index(field_def.category)
-            except ValueError:
-                category_index = len(CATEGORY_ORDER)
+            category_index = _CATEGORY_RANK.get(field_def.category, _MISSING_CATEGORY_RANK)
             return (category_index, field_def.priority, field_def.index)
         
         self._complete_field_definitions.sort(key=sort_key)
     
     def _build_category_map(self):
-        """Build mapping of categories to field indices from complete definitions."""
+        """Build category and index lookups from complete definitions."""
         self._category_fields.clear()
         for field_def in self._complete_field_definitions:
             self._category_fields[field_def.category].append(field_def.index)
+        self._by_index = {field_def.index: field_def for field_def in self._complete_field_definitions}
     
     def _update_filtered_definitions(self):
         """Update filtered field definitions based on current filter settings."""
         settings_manager = get_settings_manager()
+        self._seen_filter_version = settings_manager.filter_version
         
-        # Clear and rebuild filtered definitions
-        self._filtered_field_definitions = []
+        # Rebuild into a local list; concurrent readers keep seeing the old state
+        filtered_definitions = []
         
         for field_def in self._complete_field_definitions:
             # Check if field should be visible
@@ -146,55 +225,94 @@ class FieldManager:
                     category=field_def.category,
                     priority=field_def.priority,
                     interpret_mode=field_def.interpret_mode,
-                    translated_name=field_def.translated_name
+                    translated_name=field_def.translated_name,
+                    interpreter=field_def.interpreter
                 )
-                self._filtered_field_definitions.append(filtered_def)
+                filtered_definitions.append(filtered_def)
+        
+        # Column layout for the per-file metadata loop, aligned by position
+        defs = filtered_definitions
+        self._filtered_field_definitions = defs
+        self._filtered_columns = (
+            [field_def.index for field_def in defs],
+            [field_def.tag for field_def in defs],
+            [field_def.interpret_mode for field_def in defs],
+            [field_def.interpreter for field_def in defs],
+            [field_def.translated_name for field_def in defs],
+        )
+        # Bumped only after publishing, so a reader that sees the new revision
+        # never caches metadata built from the old columns under it
+        self._structure_dirty = True
+        self._structure_version += 1
     
     def check_and_update_filters(self):
         """Check if filter settings have changed and update if necessary."""
         settings_manager = get_settings_manager()
         
-        # Don't check if not initialized
-        if not hasattr(self, '_previous_filter_settings'):
-            self._previous_filter_settings = {}
-        
-        current_filter_settings = settings_manager.filter_settings.to_dict()
-        
-        if current_filter_settings != self._previous_filter_settings:
-            self._previous_filter_settings = current_filter_settings
+        # Settings bump a version on every filter write; compare one int
+        if settings_manager.filter_version != self._seen_filter_version:
             self._update_filtered_definitions()
             return True
         return False
     
+    @property
+    def revision(self) -> int:
+        """Counter bumped whenever translations or filtered definitions change."""
+        # Pick up pending filter changes first, so the value is never older
+        # than the columns a following get_filtered_columns() returns
+        self._sync_with_settings()
+        return self._structure_version
+    
     def set_language(self, language: str):
         """Change language and reload translations."""
-        # Language is now managed by settings
+        # Language is now managed by settings, which notifies us of the change
         settings_manager = get_settings_manager()
         settings_manager.language = language
+    
+    def notify_language_change(self, language: str):
+        """Notify that the settings language has changed."""
         self._update_language()
     
-    def get_field_structure(self) -> List[Dict[str, Any]]:
-        """Get sorted FILTERED field structure with translations."""
-        # Update language in case it changed
-        settings_manager = get_settings_manager()
-        if settings_manager.language != self.current_language:
-            self._update_language()
-        
+    def _sync_with_settings(self):
+        """Pick up filter changes made through the settings manager."""
         # Only check for filter updates if filter is initialized
         if self._filter_initialized:
             self.check_and_update_filters()
+    
+    def get_filtered_columns(self) -> Tuple[List[str], List[Any], List[str], List[Optional[Callable]], List[str]]:
+        """
+        Get FILTERED fields as parallel lists: indices, tags, interpret modes,
+        interpreters and translated names.
         
-        return [
-            {
-                "name": field_def.translated_name,
-                "index": field_def.index,
-                "tag": field_def.tag,
-                "category": field_def.category,
-                "priority": field_def.priority,
-                "interpret_mode": field_def.interpret_mode
-            }
-            for field_def in self._filtered_field_definitions
-        ]
+        The lists are shared between callers; treat them as read-only.
+        """
+        self._sync_with_settings()
+        return self._filtered_columns
+    
+    def get_field_structure(self) -> List[Dict[str, Any]]:
+        """
+        Get sorted FILTERED field structure with translations.
+        
+        The list is cached and shared between callers; treat it as read-only.
+        """
+        self._sync_with_settings()
+        
+        if self._structure_dirty or self._structure_cache is None:
+            self._structure_cache = [
+                {
+                    "name": field_def.translated_name,
+                    "index": field_def.index,
+                    "tag": field_def.tag,
+                    "category": field_def.category,
+                    "priority": field_def.priority,
+                    "interpret_mode": field_def.interpret_mode,
+                    "interpreter": field_def.interpreter
+                }
+                for field_def in self._filtered_field_definitions
+            ]
+            self._structure_dirty = False
+        
+        return self._structure_cache
     
     def get_complete_field_structure(self) -> List[Dict[str, Any]]:
         """Get sorted COMPLETE field structure with translations (for settings UI)."""
@@ -221,23 +339,26 @@ class FieldManager:
         return self._filtered_field_definitions
     
     def get_categories_with_fields(self) -> Dict[str, Dict[str, Any]]:
-        """Get COMPLETE categories with their field information (for settings UI)."""
-        # Update language in case it changed
-        self._update_language()
+        """
+        Get COMPLETE categories with their field information (for settings UI).
+        
+        The returned structure is cached and shared between callers; treat it
+        as read-only.
+        """
+        if (self._categories_cache is not None
+                and self._categories_cache_version == self._structure_version):
+            return self._categories_cache
         
         result = {}
         for category in CATEGORY_ORDER:
             if category in self._category_fields:
-                fields = []
-                for field_index in self._category_fields[category]:
-                    # Find field definition in complete list
-                    for field_def in self._complete_field_definitions:
-                        if field_def.index == field_index:
-                            fields.append({
-                                "index": field_index,
-                                "name": field_def.translated_name
-                            })
-                            break
+                fields = [
+                    {
+                        "index": field_index,
+                        "name": self._by_index[field_index].translated_name
+                    }
+                    for field_index in self._category_fields[category]
+                ]
                 
                 # Translate category name
                 category_key = f"CATEGORY_{category}"
@@ -247,22 +368,20 @@ class FieldManager:
                     "fields": fields
                 }
         
+        self._categories_cache = result
+        self._categories_cache_version = self._structure_version
         return result
     
     def translate_value(self, value: str) -> str:
         """Translate value components (VALUE_*, MSG_*)."""
         if isinstance(value, str):
-            parts = value.split()
-            translated_parts = []
-            
-            for part in parts:
-                if part.startswith(('VALUE_', 'MSG_')):
-                    translated_part = self.translations.get(part, part)
-                    translated_parts.append(translated_part)
-                else:
-                    translated_parts.append(part)
-            
-            return ' '.join(translated_parts)
+            translations = self.translations
+            # Whitespace is normalized to single spaces first, so multi-line or
+            # padded values (e.g. parser error messages) display on one line;
+            # then only the matching tokens are looked up
+            return _TOKEN_RE.sub(
+                lambda m: translations.get(m.group(0), m.group(0)), ' '.join(value.split())
+            )
         
         return str(value)
     
@@ -1,10 +1,67 @@
 # interpreters/slice_timing_interpreter.py
 """Slice timing interpreter for multi-vendor DICOM files."""
-from typing import Dict, Any, List, Optional, Tuple
-import numpy as np
+import functools
+from types import MappingProxyType
+from typing import Callable, Dict, Any, List, Mapping, Optional, Tuple
 
 
-def interpret_slice_timing(timing_context: Dict[str, Any]) -> Dict[str, str]:
+# Every key interpret_slice_timing can emit (translated once per language)
+TIMING_RESULT_KEYS = (
+    "META_SLICE_TIMING",
+    "META_SLICE_TIMING_AVAILABLE",
+    "META_SLICE_TIMING_SOURCE",
+    "META_SLICE_TIMING_NOTE",
+    "META_SLICE_TIMING_ERROR",
+    "META_NUMBER_OF_SLICES",
+    "META_ACQUISITION_ORDER",
+    "META_IMAGE_TYPE",
+    "META_TIMING_RANGE_MS",
+    "META_ESTIMATED_SLICE_INTERVAL_MS",
+    "META_TRIGGER_TIME",
+    "META_RTIA_TIMER",
+    "META_NOTE",
+    "META_WARNING",
+    "META_RECOMMENDATION",
+)
+
+# 固定内容的结果（只读，所有调用共享同一对象）
+_UNSUPPORTED_MANUFACTURER = MappingProxyType({"META_SLICE_TIMING": "MSG_UNSUPPORTED_MANUFACTURER"})
+_SIEMENS_FRAME_ACQ_TIME = MappingProxyType({
+    "META_SLICE_TIMING_AVAILABLE": "VALUE_YES (Frame Acquisition Time)",
+    "META_SLICE_TIMING_SOURCE": "Public tag (0018,9074)",
+    "META_NOTE": "MSG_USING_FRAME_ACQ_TIME"
+})
+_SIEMENS_NOT_FOUND = MappingProxyType({
+    "META_SLICE_TIMING_AVAILABLE": "VALUE_NO",
+    "META_SLICE_TIMING_NOTE": "MSG_SIEMENS_TIMING_NOT_FOUND"
+})
+_GE_PROTOCOL_BLOCK = MappingProxyType({
+    "META_SLICE_TIMING_AVAILABLE": "VALUE_PARTIAL",
+    "META_SLICE_TIMING_SOURCE": "GE Protocol Data Block (0025,101B)",
+    "META_NOTE": "MSG_ONLY_ACQ_ORDER",
+    "META_WARNING": "MSG_TIMING_ESTIMATION"
+})
+_GE_NOT_FOUND = MappingProxyType({
+    "META_SLICE_TIMING_AVAILABLE": "VALUE_NO",
+    "META_SLICE_TIMING_NOTE": "MSG_GE_TIMING_NOT_FOUND"
+})
+_PHILIPS_TEMPORAL_POSITION = MappingProxyType({
+    "META_SLICE_TIMING_AVAILABLE": "VALUE_PARTIAL",
+    "META_SLICE_TIMING_SOURCE": "Philips Temporal Position (0020,0100)",
+    "META_NOTE": "MSG_LIMITED_TIMING_INFO"
+})
+_PHILIPS_FRAME_ACQ_TIME = MappingProxyType({
+    "META_SLICE_TIMING_AVAILABLE": "VALUE_PARTIAL",
+    "META_SLICE_TIMING_SOURCE": "Frame Acquisition Time (0018,9074)",
+    "META_NOTE": "MSG_USING_FRAME_ACQ_TIME_GENERIC"
+})
+_PHILIPS_NO_TIMING = MappingProxyType({
+    "META_SLICE_TIMING_AVAILABLE": "VALUE_NO",
+    "META_SLICE_TIMING_NOTE": "MSG_PHILIPS_NO_TIMING",
+    "META_RECOMMENDATION": "MSG_CHECK_CONSOLE"
+})
+
+def interpret_slice_timing(timing_context: Dict[str, Any]) -> Mapping[str, str]:
     """
     解读多厂商slice timing信息，返回索引而非文字
     
@@ -12,50 +69,79 @@ def interpret_slice_timing(timing_context: Dict[str, Any]) -> Dict[str, str]:
         timing_context: 包含厂商、设备、序列类型和各种timing标签的上下文字典
         
     返回:
-        Dict[str, str]: 解读结果字典，包含采集顺序和模式分析（键为索引）
+        Mapping[str, str]: 解读结果（只读映射），包含采集顺序和模式分析（键为索引）
     """
-    manufacturer = str(timing_context.get("manufacturer", "")).upper()
-    
-    # 根据厂商选择解读策略
-    if "SIEMENS" in manufacturer:
-        return _interpret_siemens_timing(timing_context)
-    elif "GE" in manufacturer:
-        return _interpret_ge_timing(timing_context)
-    elif "PHILIPS" in manufacturer:
-        return _interpret_philips_timing(timing_context)
-    else:
-        return {"META_SLICE_TIMING": "MSG_UNSUPPORTED_MANUFACTURER"}
+    interpreter = _vendor_interpreter(str(timing_context.get("manufacturer", "")))
+    if interpreter is None:
+        return _UNSUPPORTED_MANUFACTURER
+    return interpreter(timing_context)
+
 
+@functools.lru_cache(maxsize=32)
+def _vendor_interpreter(manufacturer: str) -> Optional[Callable[[Dict[str, Any]], Mapping[str, str]]]:
+    """按厂商选择解读函数（同一序列的厂商相同，结果被缓存）"""
+    manufacturer = manufacturer.upper()
+    # 按表顺序匹配，首个命中即返回
+    for vendor, interpreter in _VENDOR_INTERPRETERS:
+        if vendor in manufacturer:
+            return interpreter
+    return None
 
-def _interpret_siemens_timing(context: Dict[str, Any]) -> Dict[str, str]:
+
+def _interpret_siemens_timing(context: Dict[str, Any]) -> Mapping[str, str]:
     """解读Siemens slice timing"""
     timing_info = context.get("slice_timing_siemens")  # (0019,1029)
     
-    if timing_info is None:
+    # 空序列与缺失同等处理，避免进入数值转换和排序
+    if timing_info is None or (hasattr(timing_info, "__len__") and len(timing_info) == 0):
         # 尝试备选方法
         frame_acq_time = context.get("frame_acquisition_time")
         if frame_acq_time:
-            return {
-                "META_SLICE_TIMING_AVAILABLE": "VALUE_YES (Frame Acquisition Time)",
-                "META_SLICE_TIMING_SOURCE": "Public tag (0018,9074)",
-                "META_NOTE": "MSG_USING_FRAME_ACQ_TIME"
-            }
-        return {"META_SLICE_TIMING_AVAILABLE": "VALUE_NO", "META_SLICE_TIMING_NOTE": "MSG_SIEMENS_TIMING_NOT_FOUND"}
+            return _SIEMENS_FRAME_ACQ_TIME
+        return _SIEMENS_NOT_FOUND
+    
+    # 同一序列的每个文件携带相同的timing，按(timing, TR, mosaic)缓存解读结果
+    tr = context.get("tr")
+    if tr:
+        try:
+            tr = float(tr)
+        except (TypeError, ValueError):
+            tr = None
+    else:
+        tr = None
+    is_mosaic = _is_mosaic(str(context.get("image_type", "")))
     
+    import numpy as np  # deferred: only the Siemens path needs numpy
     try:
-        # 提取采集顺序
-        acquisition_order = _extract_acquisition_order(timing_info)
+        timing_key = tuple(np.asarray(timing_info, dtype=np.float64).ravel().tolist())
+    except (TypeError, ValueError):
+        # 无法转为数值序列：不缓存，交由解读逻辑报告错误
+        return _interpret_siemens_order.__wrapped__(timing_info, tr, is_mosaic)
+    
+    # 返回只读视图，缓存中的结果不被调用方修改
+    return MappingProxyType(_interpret_siemens_order(timing_key, tr, is_mosaic))
+
+
+@functools.lru_cache(maxsize=32)
+def _is_mosaic(image_type: str) -> bool:
+    """image_type是否标记为MOSAIC（同一序列取值相同，结果被缓存）"""
+    return "MOSAIC" in image_type.upper()
+
+
+@functools.lru_cache(maxsize=256)
+def _interpret_siemens_order(timing_info: Any, tr: Optional[float], is_mosaic: bool) -> Dict[str, str]:
+    """由Siemens timing值解读采集顺序（纯函数，结果被缓存，勿修改）"""
+    try:
+        # 提取采集顺序及timing范围
+        extracted = _extract_acquisition_order(timing_info)
         
-        if not acquisition_order:
+        if not extracted or not extracted[0]:
             return {"META_SLICE_TIMING_AVAILABLE": "VALUE_ERROR", "META_SLICE_TIMING_ERROR": "MSG_FAILED_TO_PARSE"}
+        acquisition_order, timing_range = extracted
         
         # 将采集顺序转换为类MATLAB表达式
         matlab_expression = _convert_to_matlab_expression(acquisition_order)
         
-        # 获取额外的序列信息
-        image_type = str(context.get("image_type", "")).upper()
-        is_mosaic = "MOSAIC" in image_type
-        
         # 构建返回结果
         results = {
             "META_SLICE_TIMING_AVAILABLE": "VALUE_YES",
@@ -65,20 +151,16 @@ def _interpret_siemens_timing(context: Dict[str, Any]) -> Dict[str, str]:
             "META_IMAGE_TYPE": "VALUE_MOSAIC" if is_mosaic else "VALUE_STANDARD",
         }
         
-        # 如果有timing范围信息
-        if '_last_timing_range' in globals():
-            min_t, max_t = _last_timing_range
+        # timing范围信息
+        if timing_range is not None:
+            min_t, max_t = timing_range
             results["META_TIMING_RANGE_MS"] = f"{min_t:.1f} - {max_t:.1f}"
             
             # 计算slice间隔（如果有TR信息）
-            if context.get("tr"):
-                try:
-                    tr = float(context["tr"])
-                    n_slices = len(acquisition_order)
-                    estimated_slice_interval = tr / n_slices
-                    results["META_ESTIMATED_SLICE_INTERVAL_MS"] = f"{estimated_slice_interval:.1f}"
-                except:
-                    pass
+            if tr is not None:
+                n_slices = len(acquisition_order)
+                estimated_slice_interval = tr / n_slices
+                results["META_ESTIMATED_SLICE_INTERVAL_MS"] = f"{estimated_slice_interval:.1f}"
         
         return results
         
@@ -89,7 +171,7 @@ def _interpret_siemens_timing(context: Dict[str, Any]) -> Dict[str, str]:
         }
 
 
-def _interpret_ge_timing(context: Dict[str, Any]) -> Dict[str, str]:
+def _interpret_ge_timing(context: Dict[str, Any]) -> Mapping[str, str]:
     """解读GE slice timing"""
     # 尝试多种方法获取timing信息
     trigger_time = context.get("trigger_time")  # (0018,1060)
@@ -112,76 +194,58 @@ def _interpret_ge_timing(context: Dict[str, Any]) -> Dict[str, str]:
         }
     elif protocol_block is not None:
         # Protocol block通常只包含采集顺序（顺序或交错），不包含精确时间
-        return {
-            "META_SLICE_TIMING_AVAILABLE": "VALUE_PARTIAL",
-            "META_SLICE_TIMING_SOURCE": "GE Protocol Data Block (0025,101B)",
-            "META_NOTE": "MSG_ONLY_ACQ_ORDER",
-            "META_WARNING": "MSG_TIMING_ESTIMATION"
-        }
+        return _GE_PROTOCOL_BLOCK
     else:
-        return {
-            "META_SLICE_TIMING_AVAILABLE": "VALUE_NO",
-            "META_SLICE_TIMING_NOTE": "MSG_GE_TIMING_NOT_FOUND"
-        }
+        return _GE_NOT_FOUND
 
 
-def _interpret_philips_timing(context: Dict[str, Any]) -> Dict[str, str]:
+def _interpret_philips_timing(context: Dict[str, Any]) -> Mapping[str, str]:
     """解读Philips slice timing"""
     # Philips通常不在标准位置存储slice timing
     temporal_pos = context.get("temporal_position_identifier")
     frame_time = context.get("frame_acquisition_time")
     
     if temporal_pos is not None:
-        return {
-            "META_SLICE_TIMING_AVAILABLE": "VALUE_PARTIAL",
-            "META_SLICE_TIMING_SOURCE": "Philips Temporal Position (0020,0100)",
-            "META_NOTE": "MSG_LIMITED_TIMING_INFO"
-        }
+        return _PHILIPS_TEMPORAL_POSITION
     elif frame_time is not None:
-        return {
-            "META_SLICE_TIMING_AVAILABLE": "VALUE_PARTIAL",
-            "META_SLICE_TIMING_SOURCE": "Frame Acquisition Time (0018,9074)",
-            "META_NOTE": "MSG_USING_FRAME_ACQ_TIME_GENERIC"
-        }
+        return _PHILIPS_FRAME_ACQ_TIME
     else:
-        return {
-            "META_SLICE_TIMING_AVAILABLE": "VALUE_NO",
-            "META_SLICE_TIMING_NOTE": "MSG_PHILIPS_NO_TIMING",
-            "META_RECOMMENDATION": "MSG_CHECK_CONSOLE"
-        }
+        return _PHILIPS_NO_TIMING
+
+
+# 厂商关键字 -> 解读函数，顺序即匹配优先级
+_VENDOR_INTERPRETERS = (
+    ("SIEMENS", _interpret_siemens_timing),
+    ("GE", _interpret_ge_timing),
+    ("PHILIPS", _interpret_philips_timing),
+)
 
 
-def _extract_acquisition_order(timing_info: Any) -> Optional[List[int]]:
+def _extract_acquisition_order(timing_info: Any) -> Optional[Tuple[List[int], Tuple[float, float]]]:
     """
     从timing信息中提取采集顺序（通用函数）
     
     返回:
-        List[int]: 1-based的slice采集顺序
+        Tuple[List[int], Tuple[float, float]]: 1-based的slice采集顺序，以及(最早, 最晚) timing
     """
+    import numpy as np
+    
     try:
-        # 转换为列表
-        if isinstance(timing_info, (list, tuple)):
-            timing_array = list(timing_info)
-        elif isinstance(timing_info, np.ndarray):
-            timing_array = timing_info.tolist()
+        # 转换为一维浮点数组（标量视为单个slice，多维数组展平），已是float64数组时直接使用
+        if isinstance(timing_info, np.ndarray) and timing_info.dtype == np.float64:
+            timing_array = timing_info.ravel()
+        elif isinstance(timing_info, (list, tuple)):
+            timing_array = np.fromiter(timing_info, dtype=np.float64, count=len(timing_info))
         else:
-            timing_array = [float(timing_info)]
-        
-        # 转换为浮点数
-        timing_array = [float(t) for t in timing_array]
+            timing_array = np.asarray(timing_info, dtype=np.float64).ravel()
         
-        # 创建 (timing, index) 对并排序
-        timing_with_index = [(t, i + 1) for i, t in enumerate(timing_array)]
-        sorted_by_timing = sorted(timing_with_index, key=lambda x: x[0])
+        # 稳定排序：相同timing保持原slice顺序
+        order = (np.argsort(timing_array, kind='stable') + 1).tolist()
         
-        # 返回采集顺序
-        order = [idx for _, idx in sorted_by_timing]
+        # 同时返回timing范围供后续使用
+        timing_range = (float(timing_array.min()), float(timing_array.max()))
         
-        # 同时保存timing范围供后续使用
-        global _last_timing_range
-        _last_timing_range = (min(timing_array), max(timing_array))
-        
-        return order
+        return order, timing_range
         
     except Exception:
         return None
@@ -197,77 +261,56 @@ def _convert_to_matlab_expression(order: List[int]) -> str:
     返回:
         str: 类MATLAB表达式，如 "[31:-2:1,32:-2:2]" 或原始列表
     """
-    if not order:
+    n = len(order)
+    if n == 0:
         return "[]"
     
-    if len(order) < 4:
+    if n < 4:
         # 少于4个元素，直接返回原始列表
         return str(order)
     
+    diffs = [b - a for a, b in zip(order, order[1:])]
+    
+    # run_length[k]: 从diffs[k]开始连续相等的差值个数（从后往前一次算出）
+    run_length = [1] * len(diffs)
+    for k in range(len(diffs) - 2, -1, -1):
+        if diffs[k] == diffs[k + 1]:
+            run_length[k] = run_length[k + 1] + 1
+    
     # 存储找到的等差数列段
     segments = []
+    found_run = False
     i = 0
     
-    while i < len(order):
-        # 尝试从当前位置找等差数列
-        found = False
-        
+    while i < n:
         # 如果剩余元素少于4个，直接添加剩余元素
-        if i + 3 >= len(order):
-            for j in range(i, len(order)):
-                segments.append(str(order[j]))
+        if i + 3 >= n:
+            segments.extend(str(x) for x in order[i:])
             break
         
-        # 从当前位置开始，尝试找到等差数列
-        for start in range(i, min(i + 1, len(order) - 3)):
-            if start + 3 >= len(order):
-                break
-                
-            # 检查从start开始的四个元素是否构成等差数列
-            diff1 = order[start + 1] - order[start]
-            diff2 = order[start + 2] - order[start + 1]
-            diff3 = order[start + 3] - order[start + 2]
+        step = diffs[i]
+        if step != 0 and run_length[i] >= 3:
+            # 至少四个元素构成等差数列，整段一次取出
+            end_idx = i + run_length[i]
             
-            if diff1 == diff2 == diff3 and diff1 != 0:
-                # 找到等差数列，继续扩展
-                step = diff1
-                end_idx = start + 3
-                
-                # 继续查找符合等差数列的元素
-                while end_idx + 1 < len(order):
-                    expected_next = order[end_idx] + step
-                    if order[end_idx + 1] == expected_next:
-                        end_idx += 1
-                    else:
-                        break
-                
-                # 生成MATLAB表达式
-                if step == 1:
-                    # 步长为1，可以简化为 start:end
-                    segments.append(f"{order[start]}:{order[end_idx]}")
-                elif step == -1:
-                    # 步长为-1，简化为 start:-1:end
-                    segments.append(f"{order[start]}:{order[end_idx]}")
-                else:
-                    # 一般情况 start:step:end
-                    segments.append(f"{order[start]}:{step}:{order[end_idx]}")
-                
-                i = end_idx + 1
-                found = True
-                break
-        
-        if not found:
+            # 生成MATLAB表达式
+            if step == 1:
+                # 步长为1，可以简化为 start:end
+                segments.append(f"{order[i]}:{order[end_idx]}")
+            else:
+                # 一般情况 start:step:end（含步长-1）
+                segments.append(f"{order[i]}:{step}:{order[end_idx]}")
+            
+            i = end_idx + 1
+            found_run = True
+        else:
             # 当前位置无法形成等差数列，添加单个元素
             segments.append(str(order[i]))
             i += 1
     
     # 如果没有找到任何等差数列（所有都是单个元素），返回完整列表
-    if all(seg.isdigit() or (seg.startswith('-') and seg[1:].isdigit()) for seg in segments):
+    if not found_run:
         return str(order)
     
     # 返回MATLAB风格的表达式
     return "[" + ",".join(segments) + "]"
-
-
-# 清理全局变量
-_last_timing_range = None
\ No newline at end of file
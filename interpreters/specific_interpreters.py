@@ -1,38 +1,98 @@
 # interpreters/specific_interpreters.py
 """Specific interpreters for DICOM fields that need special handling."""
-from typing import Any, Dict, Optional, List, Tuple
-import numpy as np
+import functools
+import re
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, List, Tuple
 from .slice_timing_interpreter import interpret_slice_timing
-import pydicom
+
+# DA (YYYYMMDD) and the HHMMSS head of a TM value; DICOM digits are ASCII only
+_DATE_RE = re.compile(r'(\d{4})(\d{2})(\d{2})', re.ASCII)
+_TIME_RE = re.compile(r'(\d{2})(\d{2})(\d{2})', re.ASCII)
+# CS values of Patient's Sex
+_SEX_MAP = {
+    "M": "VALUE_MALE",
+    "F": "VALUE_FEMALE",
+    "O": "VALUE_OTHER"
+}
+# Lower-case spellings map directly, so lookups need no upper()
+_SEX_MAP.update({code.lower(): text for code, text in _SEX_MAP.items()})
+# AS (age string) unit suffixes
+_AGE_UNITS = {
+    "Y": "VALUE_YEARS",
+    "M": "VALUE_MONTHS",
+    "W": "VALUE_WEEKS",
+    "D": "VALUE_DAYS"
+}
+# Bound format templates for the multi-value fields
+_PIXEL_SPACING_FORMAT = "{:.2f} × {:.2f} mm".format
+_ACQUISITION_MATRIX_FORMAT = "{}×{} / {}×{}".format
+
+
+# Constant slice timing results, shared rather than rebuilt per file
+_TIMING_UNAVAILABLE = MappingProxyType({"META_SLICE_TIMING_AVAILABLE": "VALUE_NO"})
+_TIMING_PARSE_FAILED = MappingProxyType({"META_SLICE_TIMING_ERROR": "MSG_FAILED_TO_PARSE"})
+
+
+def _is_multi_value(value: Any) -> bool:
+    """
+    True for sequence-like values: pydicom MultiValue (not a list subclass),
+    lists, tuples and numpy arrays. Strings are excluded.
+    """
+    return hasattr(value, "__getitem__") and hasattr(value, "__len__") and not isinstance(value, (str, bytes))
+
+
+def _numeric_interpreter(decimals: int, suffix: str = "") -> Callable[[Any], str]:
+    """
+    Build an interpreter formatting a numeric value with *decimals* places
+    followed by *suffix*. Missing or non-numeric values become "–".
+    """
+    if decimals == 0:
+        # Whole numbers truncate (int()), which a "{:.0f}" template would round
+        def interpret(value: Any) -> str:
+            if value is None:
+                return "–"
+            try:
+                # pydicom DS/IS values already subclass float/int; only coerce the rest
+                num = value if isinstance(value, (int, float)) else float(value)
+                return str(int(num)) + suffix
+            except (ValueError, TypeError):
+                return "–"
+        return interpret
+    
+    # Format template built once per field rather than per value
+    template = f"{{:.{decimals}f}}{suffix}".format
+    
+    def interpret(value: Any) -> str:
+        if value is None:
+            return "–"
+        try:
+            return template(value if isinstance(value, (int, float)) else float(value))
+        except (ValueError, TypeError):
+            return "–"
+    return interpret
+
 
 def META_SEX(value: Any) -> str:
     """Interpret sex field."""
     if value is None:
         return "–"
-    sex_map = {
-        "M": "VALUE_MALE",
-        "F": "VALUE_FEMALE",
-        "O": "VALUE_OTHER"
-    }
-    return sex_map.get(str(value).upper(), str(value))
+    sex_str = value if type(value) is str else str(value)
+    return _SEX_MAP.get(sex_str, sex_str)
 
 
 def META_AGE(value: Any) -> str:
     """Interpret age field."""
     if value is None:
         return "–"
-    age_str = str(value)
+    age_str = value if type(value) is str else str(value)
+    # AS values are nnnU with an upper-case unit; anything else takes the slow path
+    if len(age_str) == 4 and age_str[3] in _AGE_UNITS:
+        return age_str[:3] + " " + _AGE_UNITS[age_str[3]]
     if len(age_str) >= 4:
-        num = age_str[:-1]
         unit = age_str[-1].upper()
-        unit_map = {
-            "Y": "VALUE_YEARS",
-            "M": "VALUE_MONTHS",
-            "W": "VALUE_WEEKS",
-            "D": "VALUE_DAYS"
-        }
-        if unit in unit_map:
-            return f"{num} {unit_map[unit]}"
+        if unit in _AGE_UNITS:
+            return age_str[:-1] + " " + _AGE_UNITS[unit]
     return age_str
 
 
@@ -51,9 +111,10 @@ def META_STUDY_DATE(value: Any) -> str:
     """Interpret date field (YYYYMMDD -> YYYY-MM-DD)."""
     if value is None:
         return "–"
-    date_str = str(value)
-    if len(date_str) == 8 and date_str.isdigit():
-        return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+    date_str = value if isinstance(value, str) else str(value)
+    match = _DATE_RE.fullmatch(date_str)
+    if match:
+        return "-".join(match.groups())
     return date_str
 
 
@@ -61,45 +122,33 @@ def META_STUDY_TIME(value: Any) -> str:
     """Interpret time field (HHMMSS.FFF -> HH:MM:SS)."""
     if value is None:
         return "–"
-    time_str = str(value).split(".")[0]  # Remove milliseconds
-    if len(time_str) >= 6 and time_str[:6].isdigit():
-        return f"{time_str[:2]}:{time_str[2:4]}:{time_str[4:6]}"
-    return str(value)
+    time_str = value if isinstance(value, str) else str(value)
+    # Six leading digits; fractional seconds after them are dropped
+    match = _TIME_RE.match(time_str)
+    if match:
+        return ":".join(match.groups())
+    return time_str
 
 
-def META_TR_MS(value: Any) -> str:
-    """Interpret TR value."""
-    return _interpret_numeric(value, decimals=1)
+META_TR_MS = _numeric_interpreter(1)  # TR value
 
 
-def META_TE_MS(value: Any) -> str:
-    """Interpret TE value."""
-    return _interpret_numeric(value, decimals=1)
+META_TE_MS = _numeric_interpreter(1)  # TE value
 
 
-def META_TI_MS(value: Any) -> str:
-    """Interpret TI value."""
-    return _interpret_numeric(value, decimals=1)
+META_TI_MS = _numeric_interpreter(1)  # TI value
 
 
-def META_FLIP_ANGLE(value: Any) -> str:
-    """Interpret flip angle."""
-    return _interpret_numeric(value, decimals=1)
+META_FLIP_ANGLE = _numeric_interpreter(1)  # flip angle
 
 
-def META_ECHO_TRAIN_LENGTH(value: Any) -> str:
-    """Interpret echo train length."""
-    return _interpret_numeric(value, decimals=0)
+META_ECHO_TRAIN_LENGTH = _numeric_interpreter(0)  # echo train length
 
 
-def META_NUMBER_OF_AVERAGES(value: Any) -> str:
-    """Interpret number of averages."""
-    return _interpret_numeric(value, decimals=1)
+META_NUMBER_OF_AVERAGES = _numeric_interpreter(1)  # number of averages
 
 
-def META_PIXEL_BANDWIDTH(value: Any) -> str:
-    """Interpret pixel bandwidth."""
-    return _interpret_numeric(value, decimals=1)
+META_PIXEL_BANDWIDTH = _numeric_interpreter(1)  # pixel bandwidth
 
 
 def META_ROWS_COLUMNS(value: Tuple[Any, Any]) -> str:
@@ -107,24 +156,14 @@ def META_ROWS_COLUMNS(value: Tuple[Any, Any]) -> str:
     if isinstance(value, tuple) and len(value) == 2:
         rows, columns = value
         if rows is not None and columns is not None:
-            return f"{rows} × {columns}"
+            return str(rows) + " × " + str(columns)
     return "–"
 
 
-def META_SLICE_THICKNESS(value: Any) -> str:
-    """Interpret slice thickness."""
-    result = _interpret_numeric(value, decimals=2)
-    if result != "–":
-        return f"{result} mm"
-    return result
+META_SLICE_THICKNESS = _numeric_interpreter(2, " mm")  # slice thickness
 
 
-def META_SLICE_SPACING(value: Any) -> str:
-    """Interpret slice spacing."""
-    result = _interpret_numeric(value, decimals=2)
-    if result != "–":
-        return f"{result} mm"
-    return result
+META_SLICE_SPACING = _numeric_interpreter(2, " mm")  # slice spacing
 
 
 def META_PIXEL_SPACING(value: Any) -> str:
@@ -132,8 +171,8 @@ def META_PIXEL_SPACING(value: Any) -> str:
     if value is None:
         return "–"
     try:
-        if isinstance(value, (list, tuple)) and len(value) >= 2:
-            return f"{float(value[0]):.2f} × {float(value[1]):.2f} mm"
+        if _is_multi_value(value) and len(value) >= 2:
+            return _PIXEL_SPACING_FORMAT(float(value[0]), float(value[1]))
         else:
             return str(value)
     except (ValueError, TypeError, IndexError):
@@ -145,36 +184,34 @@ def META_ACQUISITION_MATRIX(value: Any) -> str:
     if value is None:
         return "–"
     try:
-        if isinstance(value, (list, tuple)) and len(value) >= 4:
+        if _is_multi_value(value) and len(value) >= 4:
             # Format: [freq_rows, freq_cols, phase_rows, phase_cols]
-            return f"{value[0]}×{value[1]} / {value[2]}×{value[3]}"
+            return _ACQUISITION_MATRIX_FORMAT(value[0], value[1], value[2], value[3])
         else:
             return str(value)
     except (TypeError, IndexError):
         return str(value) if value else "–"
 
 
-def META_BITS_STORED(value: Any) -> str:
-    """Interpret bits stored."""
-    return _interpret_numeric(value, decimals=0)
+META_BITS_STORED = _numeric_interpreter(0)  # bits stored
 
 
-def META_SLICE_TIMING(value: Dict[str, Any]) -> Dict[str, str]:
+def META_SLICE_TIMING(value: Dict[str, Any]) -> Mapping[str, str]:
     """
     Interpret slice timing context.
-    Returns a dictionary of interpreted timing fields.
+    Returns a read-only mapping of interpreted timing fields.
     """
     if not isinstance(value, dict):
-        return {"META_SLICE_TIMING_AVAILABLE": "VALUE_NO"}
+        return _TIMING_UNAVAILABLE
     
     # Call the existing slice timing interpreter
     result = interpret_slice_timing(value)
     
     # Flatten the result if needed
-    if isinstance(result, dict):
+    if isinstance(result, Mapping):
         return result
     else:
-        return {"META_SLICE_TIMING_ERROR": "MSG_FAILED_TO_PARSE"}
+        return _TIMING_PARSE_FAILED
 
 def META_TRANSFER_SYNTAX_UID(value: Any) -> str:
     """seen https://dicom.nema.org/medical/dicom/current/output/chtml/part06/chapter_a.html"""
@@ -182,31 +219,21 @@ def META_TRANSFER_SYNTAX_UID(value: Any) -> str:
     if value is None:
         return "–"
     try:
-        # Convert to UID object if it's a string
-        uid = pydicom.uid.UID(str(value))
-
-        # Get the human-readable name
-        name = uid.name
-        return f"{name}"
-            
+        return _uid_name(str(value))
     except Exception:
         # If any error occurs, just return the raw value
         return str(value)
 
 
-# Helper function
-def _interpret_numeric(value: Any, decimals: int = 1) -> str:
-    """Interpret numeric value with specified decimal places."""
-    if value is None:
-        return "–"
-    try:
-        num = float(value)
-        if decimals == 0:
-            return str(int(num))
-        else:
-            return f"{num:.{decimals}f}"
-    except (ValueError, TypeError):
-        return "–"
-    
+@functools.lru_cache(maxsize=128)
+def _uid_name(uid_str: str) -> str:
+    """Human-readable name of a UID; a series only ever uses a handful."""
+    from pydicom.uid import UID  # deferred: only this interpreter needs pydicom
+    return str(UID(uid_str).name)
 
 
+# Field index -> interpreter, built once at import for dispatch by index
+INTERPRETERS: Dict[str, Callable[[Any], Any]] = {
+    name: obj for name, obj in globals().items()
+    if name.startswith("META_") and callable(obj)
+}
@@ -1,11 +1,18 @@
 # settings/settings.py
 """Settings management module for persistent configuration."""
+import atexit
 import json
+import os
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from dataclasses import dataclass, asdict, field
 import threading
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib json module
+    orjson = None
+
 
 @dataclass
 class FilterSettings:
@@ -37,7 +44,8 @@ class FilterSettings:
         if not field_indices:
             return 'checked'
         
-        visible_count = sum(1 for idx in field_indices if self.is_field_visible(idx))
+        fields = self.fields
+        visible_count = sum(1 for idx in field_indices if fields.get(idx, True))
         
         if visible_count == 0:
             return 'unchecked'
@@ -47,10 +55,10 @@ class FilterSettings:
             return 'indeterminate'
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert filter settings to dictionary."""
+        """Convert filter settings to dictionary (shares the underlying dicts)."""
         return {
-            "categories": self.categories.copy(),
-            "fields": self.fields.copy()
+            "categories": self.categories,
+            "fields": self.fields
         }
 
 
@@ -88,24 +96,55 @@ class Settings:
 class SettingsManager:
     """Manages application settings with persistence."""
     
+    # Seconds to coalesce changes before they are written to disk
+    SAVE_DELAY = 0.1
+    
     def __init__(self):
         self.settings_dir = Path(__file__).parent
         self.settings_file = self.settings_dir / "settings.json"
         self._settings: Settings = Settings()
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()
+        # Serializes file writes; always taken before _lock, never while holding it
+        self._write_lock = threading.Lock()
         self._initialized = False
+        # Incremented on every filter change so readers can detect updates cheaply
+        self._filter_version = 0
+        # Called with the new language after it changes
+        self._language_listeners: List[Callable[[str], None]] = []
+        # Pending debounced write, if any
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
         self._load_settings()
+        # Don't lose a change made just before shutdown
+        atexit.register(self.flush)
+        # A forked child (gunicorn --preload workers) inherits the timer object but
+        # not its thread, and possibly a lock held by another thread
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+    
+    def _reset_after_fork(self):
+        """Give a forked child fresh locks and no pending timer of its own."""
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._save_timer = None
+        if self._dirty:
+            # The parent still writes its pending change; schedule our own copy
+            self._save_settings()
     
     def _load_settings(self):
         """Load settings from file (except filter settings)."""
         if self.settings_file.exists():
             try:
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Only load language at this stage
-                    self._settings.language = data.get("language", "english")
-                    # Store filter data for later initialization
-                    self._stored_filter_data = data.get("filter_settings", {})
+                if orjson is not None:
+                    with open(self.settings_file, 'rb') as f:
+                        data = orjson.loads(f.read())
+                else:
+                    with open(self.settings_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                # Only load language at this stage
+                self._settings.language = data.get("language", "english")
+                # Store filter data for later initialization
+                self._stored_filter_data = data.get("filter_settings", {})
             except (json.JSONDecodeError, KeyError) as e:
                 print(f"Error loading settings: {e}")
                 self._settings = Settings()
@@ -138,23 +177,54 @@ class SettingsManager:
                     new_filter_settings.fields[field_index] = True
             
             # Copy category settings
-            new_filter_settings.categories = stored_categories.copy()
+            new_filter_settings.categories = stored_categories
             
             # Update settings
             self._settings.filter_settings = new_filter_settings
+            self._filter_version += 1
             self._initialized = True
             
             # Save the initialized settings
             self._save_settings()
     
     def _save_settings(self):
-        """Save settings to file."""
-        with self._lock:
+        """
+        Schedule a save; changes within SAVE_DELAY are written together.
+        
+        Caller must hold self._lock.
+        """
+        self._dirty = True
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush(self):
+        """Write pending settings to file now, replacing it atomically."""
+        with self._write_lock:
+            # Serialize under the lock, then do the disk I/O without holding it
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                if orjson is not None:
+                    # One C-level serialization and a single write of the bytes
+                    payload = orjson.dumps(self._settings.to_dict(), option=orjson.OPT_INDENT_2)
+                else:
+                    payload = json.dumps(self._settings.to_dict(), indent=2, ensure_ascii=False).encode('utf-8')
+                self._dirty = False
+            
             # Ensure directory exists
             self.settings_dir.mkdir(exist_ok=True)
             
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self._settings.to_dict(), f, indent=2, ensure_ascii=False)
+            # Write next to the target and swap in, so readers never see a partial file;
+            # the pid keeps concurrent writers (workers, pool processes) apart
+            tmp_file = self.settings_file.with_name(f"{self.settings_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_file, self.settings_file)
     
     @property
     def language(self) -> str:
@@ -166,9 +236,20 @@ class SettingsManager:
     def language(self, value: str):
         """Set current language."""
         with self._lock:
-            if self._settings.language != value:
-                self._settings.language = value
-                self._save_settings()
+            if self._settings.language == value:
+                return
+            self._settings.language = value
+            self._save_settings()
+            listeners = list(self._language_listeners)
+        
+        # Notify outside the lock; listeners may read settings back
+        for listener in listeners:
+            listener(value)
+    
+    def add_language_listener(self, listener: Callable[[str], None]):
+        """Register a callback invoked with the new language whenever it changes."""
+        with self._lock:
+            self._language_listeners.append(listener)
     
     @property
     def filter_settings(self) -> FilterSettings:
@@ -176,11 +257,22 @@ class SettingsManager:
         with self._lock:
             return self._settings.filter_settings
     
+    @property
+    def filter_version(self) -> int:
+        """Get counter that changes whenever filter settings are replaced."""
+        with self._lock:
+            return self._filter_version
+    
     def update_filter_settings(self, categories: Dict[str, bool], fields: Dict[str, bool]):
-        """Update filter settings."""
+        """
+        Update filter settings.
+        
+        The dicts are taken over, not copied; callers must not modify them afterwards.
+        """
         with self._lock:
-            self._settings.filter_settings.categories = categories.copy()
-            self._settings.filter_settings.fields = fields.copy()
+            self._settings.filter_settings.categories = categories
+            self._settings.filter_settings.fields = fields
+            self._filter_version += 1
             self._save_settings()
     
     def is_field_visible(self, field_index: str) -> bool:
@@ -188,6 +280,12 @@ class SettingsManager:
         with self._lock:
             return self._settings.filter_settings.is_field_visible(field_index)
     
+    def are_fields_visible(self, field_indices: List[str]) -> List[bool]:
+        """Check visibility of several fields under a single lock acquisition."""
+        with self._lock:
+            fields = self._settings.filter_settings.fields
+            return [fields.get(idx, True) for idx in field_indices]
+    
     def is_category_visible(self, category: str) -> bool:
         """Check if a category should be visible."""
         with self._lock:
@@ -196,22 +294,28 @@ class SettingsManager:
     def get_visible_field_indices(self, all_indices: List[str]) -> List[str]:
         """Get list of visible field indices."""
         with self._lock:
-            return [idx for idx in all_indices if self.is_field_visible(idx)]
+            fields = self._settings.filter_settings.fields
+            return [idx for idx in all_indices if fields.get(idx, True)]
     
     def reset_filters(self):
         """Reset all filters to show everything."""
         with self._lock:
             self._settings.filter_settings = FilterSettings()
+            self._filter_version += 1
             self._save_settings()
 
 
 # Global instance
 _settings_manager: Optional[SettingsManager] = None
+_settings_manager_lock = threading.Lock()
 
 
 def get_settings_manager() -> SettingsManager:
     """Get or create global SettingsManager instance."""
     global _settings_manager
     if _settings_manager is None:
-        _settings_manager = SettingsManager()
+        with _settings_manager_lock:
+            # Re-check: another thread may have created it while we waited
+            if _settings_manager is None:
+                _settings_manager = SettingsManager()
     return _settings_manager
\ No newline at end of file
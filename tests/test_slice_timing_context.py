@@ -0,0 +1,74 @@
+# tests/test_slice_timing_context.py
+"""Slice timing read back from header-only datasets of implicit VR files."""
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pydicom")
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import ImplicitVRLittleEndian, MRImageStorage, generate_uid
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dicom_utils import DicomController
+from interpreters.specific_interpreters import META_SLICE_TIMING
+
+
+def _write_implicit_vr_epi(path: Path, manufacturer: str, add_private) -> Path:
+    """Write a minimal single-frame MR EPI file in Implicit VR Little Endian."""
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = MRImageStorage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ImplicitVRLittleEndian
+
+    ds = Dataset()
+    ds.file_meta = meta
+    ds.SOPClassUID = MRImageStorage
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    ds.Modality = "MR"
+    ds.ScanningSequence = "EP"
+    ds.Manufacturer = manufacturer
+    ds.ImageType = ["ORIGINAL", "PRIMARY", "M", "MOSAIC"]
+    ds.RepetitionTime = 2000
+    ds.Rows = ds.Columns = 4
+    ds.BitsAllocated = ds.BitsStored = 16
+    ds.HighBit = 15
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.PixelRepresentation = 0
+    ds.PixelData = np.zeros((4, 4), dtype=np.uint16).tobytes()
+    add_private(ds)
+    ds.save_as(path, enforce_file_format=True)
+    return path
+
+
+def test_siemens_mosaic_ref_acq_times_implicit_vr(tmp_path):
+    # Interleaved acquisition of 12 slices: odd slices first, then even
+    order = [1, 3, 5, 7, 9, 11, 2, 4, 6, 8, 10, 12]
+    times = [0.0] * len(order)
+    for rank, slice_number in enumerate(order):
+        times[slice_number - 1] = rank * 80.0
+
+    def add_private(ds):
+        block = ds.private_block(0x0019, "SIEMENS MR HEADER", create=True)
+        block.add_new(0x29, "FD", times)
+
+    path = _write_implicit_vr_epi(tmp_path / "siemens.dcm", "SIEMENS", add_private)
+    result = META_SLICE_TIMING(DicomController(path)._build_slice_timing_context())
+
+    assert result["META_SLICE_TIMING_AVAILABLE"] == "VALUE_YES"
+    assert result["META_ACQUISITION_ORDER"] == "[1:2:11,2:2:12]"
+    assert result["META_NUMBER_OF_SLICES"] == "12"
+
+
+def test_ge_rtia_timer_implicit_vr(tmp_path):
+    def add_private(ds):
+        block = ds.private_block(0x0021, "GEMS_RELA_01", create=True)
+        block.add_new(0x5E, "DS", "12.5")
+
+    path = _write_implicit_vr_epi(tmp_path / "ge.dcm", "GE MEDICAL SYSTEMS", add_private)
+    result = META_SLICE_TIMING(DicomController(path)._build_slice_timing_context())
+
+    assert result["META_SLICE_TIMING_AVAILABLE"] == "VALUE_YES"
+    assert result["META_RTIA_TIMER"] == "12.5"
@@ -0,0 +1,43 @@
+# tests/test_translate_value.py
+"""Token translation inside interpreted values."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from field_organization import get_field_manager
+
+
+@pytest.fixture
+def field_manager(monkeypatch):
+    manager = get_field_manager()
+    monkeypatch.setattr(manager, "translations", {
+        "VALUE_YES": "Yes",
+        "VALUE_MOSAIC": "Mosaic",
+        "MSG_FAILED_TO_PARSE": "Failed to parse",
+    })
+    return manager
+
+
+@pytest.mark.parametrize("value, expected", [
+    # Tokens embedded in longer text
+    ("VALUE_YES (Frame Acquisition Time)", "Yes (Frame Acquisition Time)"),
+    ("slices: 36, VALUE_MOSAIC image", "slices: 36, Mosaic image"),
+    ("MSG_FAILED_TO_PARSE VALUE_YES", "Failed to parse Yes"),
+    # Only whole whitespace-delimited tokens are translated
+    ("xVALUE_YES (VALUE_YES)", "xVALUE_YES (VALUE_YES)"),
+    ("VALUE_YES,", "VALUE_YES,"),
+    # Unknown tokens are kept as-is
+    ("VALUE_UNKNOWN", "VALUE_UNKNOWN"),
+    # Whitespace runs and newlines collapse to single spaces
+    ("MSG_SIEMENS_PARSING_ERROR: bad\n  value ", "MSG_SIEMENS_PARSING_ERROR: bad value"),
+    ("  VALUE_YES\t\tVALUE_MOSAIC\n", "Yes Mosaic"),
+    ("", ""),
+])
+def test_translate_value(field_manager, value, expected):
+    assert field_manager.translate_value(value) == expected
+
+
+def test_translate_value_stringifies_non_strings(field_manager):
+    assert field_manager.translate_value(12.5) == "12.5"
@@ -0,0 +1,18 @@
+# wsgi.py
+"""WSGI entry point for running the viewer under a production server.
+
+Examples:
+    gunicorn -w 1 -k gthread --threads 8 wsgi:application
+    waitress-serve --threads=8 wsgi:application    # Windows
+
+Only a single worker process is supported; scale with threads instead.
+Language and filter settings are held in process memory (settings.json is
+written, never re-read), as are the header summary index, the controller
+and metadata caches and the translations cache. Forked workers each keep
+their own copy (``--preload`` only shares the import work), so with
+``-w 2`` or more a language or filter change reaches only the worker that
+handled the request, and other workers keep answering with the old state.
+"""
+from app import app
+
+application = app